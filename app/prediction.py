@@ -0,0 +1,100 @@
+import streamlit as st
+import utils.utils as u
+
+import services.prediction_store as ps
+
+def render():
+    stores = u.getStores()
+
+    if stores is None or stores.empty:
+        st.error("No store names found in the database.")
+        return
+
+    # Les prévisions sont précalculées après l'entraînement et partagées entre les sessions
+    with st.spinner("Loading forecasts...", width="stretch"):
+        prediction_store = ps.get_prediction_store()
+
+    if prediction_store is None:
+        st.error("No sales data available to build forecasts.")
+        return
+
+    wanted_store = st.selectbox("Select a store:", stores['store_name'])
+    selected_store = stores[stores["store_name"] == wanted_store].iloc[0]
+    store_id = selected_store["store_id"]
+
+    st.header(f"Sales Prediction: {selected_store['store_name']}")
+    st.caption(f"Model trained on {prediction_store['trained_at']:%Y-%m-%d %H:%M}")
+
+    forecasts = ps.get_forecast(prediction_store, store_id)
+
+    if forecasts is None:
+        st.info("No forecast available for this store yet.")
+        return
+
+    horizon = st.slider("Horizon (months):", 1, ps.MAX_HORIZON, 1)
+    forecast = forecasts.loc[horizon]
+
+    st.metric(
+        label=f"Forecast Amount Sold - {forecast['date']:%B %Y}",
+        value=f"${forecast['amount']:,.2f}",
+        delta=f"95 % interval: ${forecast['amount_lower']:,.2f} - ${forecast['amount_upper']:,.2f}",
+        delta_color="off",
+        border=True
+    )
+
+    st.subheader("Forecast Over the Next Months")
+    st.line_chart(forecasts.set_index("date")[["amount_lower", "amount", "amount_upper"]])
+
+    # Scénarios "what-if" calculés sur les prévisions en cache, sans réentraînement
+    with st.expander("What-if scenario"):
+        # Valeurs de référence issues de l'entraînement, cohérentes avec les prévisions en cache
+        products = prediction_store["products"]
+        sellers = prediction_store["sellers"]
+
+        if products is None or sellers is None:
+            st.info("No product or seller data available to simulate a scenario.")
+            return
+
+        price_changes = {}
+        st.markdown("**Unit prices**")
+        for product in products.itertuples():
+            new_price = st.number_input(
+                product.product_name,
+                min_value=0.0,
+                value=product.unit_price,
+                step=0.5,
+                key=f"price_{product.product_id}"
+            )
+            if new_price != product.unit_price:
+                price_changes[product.product_id] = new_price
+
+        elasticity = st.slider("Price elasticity of demand:", -3.0, 0.0, 0.0, 0.1)
+
+        seller_moves = {}
+        store_names = stores.set_index("store_id")["store_name"]
+        st.markdown("**Seller assignments**")
+        # Les vendeurs sans magasin connu ne peuvent pas être réaffectés
+        for seller in sellers[sellers["store_id"].isin(store_names.index)].itertuples():
+            new_store_id = st.selectbox(
+                seller.seller_name,
+                store_names.index,
+                index=list(store_names.index).index(seller.store_id),
+                format_func=lambda s: store_names[s],
+                key=f"seller_{seller.seller_id}"
+            )
+            if new_store_id != seller.store_id:
+                seller_moves[seller.seller_id] = new_store_id
+
+        if price_changes or seller_moves:
+            scenario = ps.what_if(prediction_store, price_changes, seller_moves, elasticity).loc[store_id]
+            scenario_forecast = scenario.loc[horizon]
+
+            st.metric(
+                label=f"Scenario Amount Sold - {scenario_forecast['date']:%B %Y}",
+                value=f"${scenario_forecast['amount']:,.2f}",
+                delta=f"${scenario_forecast['amount_delta']:,.2f} vs forecast",
+                border=True
+            )
+            st.line_chart(scenario.set_index("date")[["amount", "amount_delta"]])
+        else:
+            st.info("Change a unit price or a seller assignment to simulate a scenario.")
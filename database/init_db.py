@@ -3,6 +3,7 @@ import pathlib
 import datetime
 
 import connect_db as db
+import maintain_db as maintenance
 
 ABSOLUT_PATH = pathlib.Path(__file__).parent.parent 
 
@@ -182,9 +183,11 @@ def main():
     
     if conn:
         deleting_tables(conn)
+        maintenance.enable_incremental_vacuum(conn)
         create_table(conn)
         insert_data(conn)
         update_order_totals(conn)
+        maintenance.analyze_database(conn)
         conn.close()
     
     print("[" + str(datetime.datetime.now()) + "] — Database initialization completed successfully.")
@@ -0,0 +1,269 @@
+import sqlite3
+import argparse
+import pathlib
+import datetime
+import time
+import sys
+
+import connect_db as db
+
+BACKUP_DIR = pathlib.Path(__file__).parent / "backups"
+
+BACKUP_PAGES_PER_STEP = 64          # Nombre de pages copiées à chaque étape de sauvegarde
+BACKUP_SLEEP_SECONDS = 0.05         # Pause entre deux étapes pour laisser passer les lecteurs
+BACKUP_KEEP = 7                     # Nombre de sauvegardes conservées (les plus anciennes sont supprimées)
+INCREMENTAL_VACUUM_PAGES = 0        # 0 = libère toutes les pages libres
+
+# Met à jour les statistiques du planificateur de requêtes
+def analyze_database(conn):
+    print("[" + str(datetime.datetime.now()) + "] — Analyzing the database...")
+
+    cur = conn.cursor()
+
+    cur.execute("ANALYZE")
+    cur.execute("PRAGMA optimize")
+
+    conn.commit()
+
+    print("[" + str(datetime.datetime.now()) + "] — Database statistics updated.")
+
+# Active le vacuum incrémental (un VACUUM complet n'est nécessaire qu'une seule fois)
+def enable_incremental_vacuum(conn):
+    cur = conn.cursor()
+
+    auto_vacuum = cur.execute("PRAGMA auto_vacuum").fetchone()[0]
+
+    # 0 = NONE, 1 = FULL, 2 = INCREMENTAL
+    if auto_vacuum != 2:
+        print("[" + str(datetime.datetime.now()) + "] — Enabling incremental vacuum (full VACUUM required once)...")
+        cur.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        cur.execute("VACUUM")
+        print("[" + str(datetime.datetime.now()) + "] — Incremental vacuum enabled.")
+
+# Libère les pages inutilisées laissées par les mises à jour et suppressions
+def vacuum_database(conn):
+    print("[" + str(datetime.datetime.now()) + "] — Running incremental vacuum...")
+
+    enable_incremental_vacuum(conn)
+
+    cur = conn.cursor()
+
+    freelist_before = cur.execute("PRAGMA freelist_count").fetchone()[0]
+    # INFO : le pragma libère une page par étape et execute() ne fait qu'une seule étape
+    # pour une requête sans colonnes, executescript() le fait tourner jusqu'au bout
+    cur.executescript(f"PRAGMA incremental_vacuum({INCREMENTAL_VACUUM_PAGES});")
+    freelist_after = cur.execute("PRAGMA freelist_count").fetchone()[0]
+
+    conn.commit()
+
+    print("[" + str(datetime.datetime.now()) + f"] — Incremental vacuum done: {freelist_before - freelist_after} pages released.")
+
+    if INCREMENTAL_VACUUM_PAGES == 0 and freelist_after > 0:
+        print("[" + str(datetime.datetime.now()) + f"] — Warning: {freelist_after} free pages remain after incremental vacuum.")
+
+    return freelist_before - freelist_after
+
+# Vérifie l'intégrité de la base (quick_check est plus rapide mais moins complet)
+def check_integrity(conn, quick=False):
+    print("[" + str(datetime.datetime.now()) + "] — Checking database integrity...")
+
+    cur = conn.cursor()
+
+    pragma = "quick_check" if quick else "integrity_check"
+    errors = [r[0] for r in cur.execute(f"PRAGMA {pragma}").fetchall() if r[0] != "ok"]
+    errors += [f"Foreign key violation in {r[0]} (rowid {r[1]}) -> {r[2]}" for r in cur.execute("PRAGMA foreign_key_check").fetchall()]
+
+    if errors:
+        for error in errors:
+            print("[" + str(datetime.datetime.now()) + f"] — Integrity error: {error}")
+    else:
+        print("[" + str(datetime.datetime.now()) + "] — Database integrity OK.")
+
+    return errors
+
+# Sauvegarde à chaud via l'API backup de sqlite3
+# INFO : la copie se fait par petites étapes, les lecteurs ne sont donc pas bloqués pendant la sauvegarde
+def backup_database(conn, backup_dir=BACKUP_DIR):
+    backup_dir = pathlib.Path(backup_dir)
+    backup_dir.mkdir(parents=True, exist_ok=True)
+
+    backup_path = backup_dir / f"app_database_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.db"
+
+    print("[" + str(datetime.datetime.now()) + f"] — Backing up the database to {backup_path}...")
+
+    def progress(status, remaining, total):
+        print("[" + str(datetime.datetime.now()) + f"] — Backup progress: {total - remaining}/{total} pages copied")
+
+    target = sqlite3.connect(backup_path)
+    try:
+        conn.backup(target, pages=BACKUP_PAGES_PER_STEP, progress=progress, sleep=BACKUP_SLEEP_SECONDS)
+    except BaseException:
+        # On ne laisse pas une sauvegarde incomplète sur le disque
+        target.close()
+        backup_path.unlink(missing_ok=True)
+        raise
+    target.close()
+
+    print("[" + str(datetime.datetime.now()) + "] — Backup completed successfully.")
+
+    prune_backups(backup_dir)
+
+    return backup_path
+
+# Supprime les sauvegardes les plus anciennes pour n'en garder que BACKUP_KEEP
+# INFO : le nom des fichiers contient la date, l'ordre alphabétique est donc l'ordre chronologique
+def prune_backups(backup_dir=BACKUP_DIR, keep=BACKUP_KEEP):
+    backups = sorted(pathlib.Path(backup_dir).glob("app_database_*.db"))
+
+    for old_backup in backups[:-keep] if keep > 0 else backups:
+        old_backup.unlink()
+        print("[" + str(datetime.datetime.now()) + f"] — Old backup deleted: {old_backup}")
+
+# Récupère la taille des tables et index
+### name : nom de la table ou de l'index
+### type : table ou index
+### pages : nombre de pages utilisées
+### size_bytes : taille en octets
+def get_object_sizes(conn):
+    cur = conn.cursor()
+
+    try:
+        # dbstat n'est disponible que si SQLite a été compilé avec SQLITE_ENABLE_DBSTAT_VTAB
+        rows = cur.execute("""
+            SELECT d.name, m.type, COUNT(*) AS pages, SUM(d.pgsize) AS size_bytes
+            FROM dbstat d
+            LEFT JOIN sqlite_master m ON m.name = d.name
+            GROUP BY d.name
+            ORDER BY size_bytes DESC
+        """).fetchall()
+    except sqlite3.OperationalError:
+        # Sans dbstat on ne peut qu'estimer le nombre de lignes par table
+        rows = []
+        for (name,) in cur.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'").fetchall():
+            count = cur.execute(f'SELECT COUNT(*) FROM "{name}"').fetchone()[0]
+            rows.append((name, "table", None, None, count))
+        return [{"name": r[0], "type": r[1], "pages": r[2], "size_bytes": r[3], "row_count": r[4]} for r in rows]
+
+    return [{"name": r[0], "type": r[1] or "table", "pages": int(r[2]), "size_bytes": int(r[3])} for r in rows]
+
+# Récupère les statistiques de stockage et de cache de la base
+### page_size : taille d'une page en octets
+### page_count : nombre total de pages
+### freelist_count : nombre de pages libres (fragmentation)
+### cache_pages : nombre de pages que le cache peut contenir
+### cache_coverage : part de la base pouvant tenir dans le cache (%)
+def get_storage_stats(conn):
+    cur = conn.cursor()
+
+    page_size = cur.execute("PRAGMA page_size").fetchone()[0]
+    page_count = cur.execute("PRAGMA page_count").fetchone()[0]
+    freelist_count = cur.execute("PRAGMA freelist_count").fetchone()[0]
+    cache_size = cur.execute("PRAGMA cache_size").fetchone()[0]
+
+    # Une valeur négative de cache_size est exprimée en KiB et non en pages
+    cache_pages = cache_size if cache_size >= 0 else (-cache_size * 1024) // page_size
+
+    return {
+        "page_size": page_size,
+        "page_count": page_count,
+        "size_bytes": page_size * page_count,
+        "freelist_count": freelist_count,
+        "fragmentation": (freelist_count / page_count * 100) if page_count else 0,
+        "cache_pages": cache_pages,
+        "cache_coverage": min(cache_pages / page_count * 100, 100) if page_count else 100,
+    }
+
+# Affiche le rapport de taille et d'efficacité du cache
+def report_database(conn):
+    print("[" + str(datetime.datetime.now()) + "] — Building database size report...")
+
+    stats = get_storage_stats(conn)
+    sizes = get_object_sizes(conn)
+
+    print(f"Database size   : {stats['size_bytes'] / 1024:,.1f} KiB ({stats['page_count']} pages of {stats['page_size']} bytes)")
+    print(f"Free pages      : {stats['freelist_count']} ({stats['fragmentation']:.2f} %)")
+    print(f"Page cache      : {stats['cache_pages']} pages ({stats['cache_coverage']:.2f} % of the database fits in cache)")
+
+    for obj in sizes:
+        if obj["size_bytes"] is not None:
+            print(f"  {obj['type']:<6} {obj['name']:<40} {obj['pages']:>8} pages {obj['size_bytes'] / 1024:>12,.1f} KiB")
+        else:
+            print(f"  {obj['type']:<6} {obj['name']:<40} {obj['row_count']:>8} rows")
+
+    return stats, sizes
+
+# Lance toutes les tâches de maintenance
+def run_maintenance(conn, backup=True):
+    errors = check_integrity(conn, quick=True)
+
+    # On ne sauvegarde pas et on ne réorganise pas une base corrompue
+    if errors:
+        print("[" + str(datetime.datetime.now()) + "] — Maintenance aborted: integrity errors found.")
+        return False
+
+    if backup:
+        backup_database(conn)
+
+    vacuum_database(conn)
+    analyze_database(conn)
+    report_database(conn)
+
+    return True
+
+# Vérifie l'intégrité de la base et retourne False si des erreurs sont trouvées
+def run_integrity_check(conn):
+    return not check_integrity(conn)
+
+# INFO : une tâche qui retourne False est considérée en échec
+TASKS = {
+    "analyze": analyze_database,
+    "vacuum": vacuum_database,
+    "check": run_integrity_check,
+    "backup": backup_database,
+    "report": report_database,
+    "all": run_maintenance,
+}
+
+# Valide l'intervalle de planification (doit être strictement positif)
+def positive_hours(value):
+    hours = float(value)
+    if hours <= 0:
+        raise argparse.ArgumentTypeError(f"must be a positive number of hours, got {value}")
+    return hours
+
+# Fonction principale pour la maintenance de la base de données
+### task : tâche à lancer (voir TASKS)
+### every : intervalle en heures entre deux exécutions (None = une seule exécution)
+def main():
+    parser = argparse.ArgumentParser(description="Database maintenance")
+    parser.add_argument("task", nargs="?", default="all", choices=list(TASKS.keys()))
+    parser.add_argument("--every", type=positive_hours, default=None, help="Run the task every N hours")
+    args = parser.parse_args()
+
+    while True:
+        print("[" + str(datetime.datetime.now()) + f"] — Running maintenance task '{args.task}'...")
+        conn = db.connect_db()
+        success = False
+
+        if conn:
+            try:
+                success = TASKS[args.task](conn) is not False
+            # Une erreur (base verrouillée, disque plein...) ne doit pas arrêter les exécutions planifiées
+            except (sqlite3.Error, OSError) as e:
+                print("[" + str(datetime.datetime.now()) + f"] — Maintenance task '{args.task}' error: {e}")
+            finally:
+                conn.close()
+
+        if success:
+            print("[" + str(datetime.datetime.now()) + f"] — Maintenance task '{args.task}' completed.")
+        else:
+            print("[" + str(datetime.datetime.now()) + f"] — Maintenance task '{args.task}' failed.")
+
+        # Code de sortie non nul pour que cron ou un ordonnanceur puisse détecter l'échec
+        if args.every is None:
+            sys.exit(0 if success else 1)
+
+        time.sleep(args.every * 3600)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+import datetime
+import os
+import pathlib
+import tempfile
+import threading
+
+import joblib
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import utils.utils as u
+
+PREDICTION_STORE_PATH = pathlib.Path(__file__).parent.parent / "models" / "prediction_store.joblib"
+
+MAX_HORIZON = 12        # Nombre de mois prévus après le dernier mois connu
+INTERVAL_Z = 1.96       # Intervalle de prédiction à 95 %
+
+# Un seul réentraînement à la fois pour toutes les sessions du serveur
+_TRAINING_LOCK = threading.Lock()
+
+# Construit la matrice des quantités mensuelles (une colonne par série magasin / vendeur / produit)
+# INFO : les mois sans vente pour une série sont complétés par 0
+def build_series_matrix(quantities):
+    pivot = quantities.pivot_table(
+        index="date",
+        columns=["store_id", "seller_id", "product_id"],
+        values="quantity",
+        aggfunc="sum",
+        fill_value=0
+    )
+
+    pivot.index = pd.PeriodIndex(pivot.index, freq="M")
+    months = pd.period_range(pivot.index.min(), pivot.index.max(), freq="M")
+
+    return pivot.reindex(months, fill_value=0)
+
+
+# Construit la matrice explicative : constante, tendance et saisonnalité mensuelle
+def build_design_matrix(periods, first_period):
+    trend = (periods.year - first_period.year) * 12 + (periods.month - first_period.month)
+    seasonality = np.eye(12)[periods.month - 1][:, 1:]
+
+    return np.column_stack([np.ones(len(periods)), trend, seasonality])
+
+
+# Entraîne le modèle sur toutes les séries en une seule résolution et précalcule les prévisions
+### quantities : quantités prévues par horizon et par série (MAX_HORIZON x séries)
+### variances : variances de prédiction associées
+### series_prices : prix unitaire courant de chaque série
+### forecasts : prévisions par magasin et horizon, servies par clé (store_id, horizon)
+### fingerprint : empreinte des données d'entraînement, pour détecter une modification de la base
+### products, sellers : produits et vendeurs au moment de l'entraînement (valeurs de référence des scénarios)
+def train_prediction_store():
+    print("[" + str(datetime.datetime.now()) + "] — Training the forecast model...")
+
+    # On vide le cache des requêtes pour entraîner sur les données actuelles
+    u.getSalesDataFingerprint.clear()
+    u.getMonthlyQuantities.clear()
+    u.getProducts.clear()
+    u.getSellers.clear()
+    u.getStores.clear()
+
+    fingerprint = u.getSalesDataFingerprint()
+    quantities = u.getMonthlyQuantities()
+    products = u.getProducts()
+    sellers = u.getSellers()
+    stores = u.getStores()
+
+    if quantities is None or products is None or stores is None:
+        print("[" + str(datetime.datetime.now()) + "] — No sales data available for training.")
+        return None
+
+    series = build_series_matrix(quantities)
+    first_period = series.index[0]
+
+    X = build_design_matrix(series.index, first_period)
+    Y = series.to_numpy(dtype=float)
+
+    # Une régression linéaire par série, toutes résolues en même temps
+    coefficients, *_ = np.linalg.lstsq(X, Y, rcond=None)
+    residuals = Y - X @ coefficients
+    degrees_of_freedom = max(len(X) - X.shape[1], 1)
+    sigma2 = (residuals ** 2).sum(axis=0) / degrees_of_freedom
+
+    future_periods = pd.period_range(series.index[-1] + 1, periods=MAX_HORIZON, freq="M")
+    X_future = build_design_matrix(future_periods, first_period)
+
+    # Variance de prédiction : bruit résiduel + incertitude sur les coefficients
+    leverage = np.einsum("ij,jk,ik->i", X_future, np.linalg.pinv(X.T @ X), X_future)
+
+    unit_prices = products.set_index("product_id")["unit_price"]
+    product_ids = series.columns.get_level_values("product_id").to_numpy()
+
+    prediction_store = {
+        "trained_at": datetime.datetime.now(),
+        "fingerprint": fingerprint,
+        "products": products,
+        "sellers": sellers,
+        "dates": future_periods.to_timestamp().to_numpy(),
+        "all_store_ids": stores["store_id"].to_numpy(),
+        "store_ids": series.columns.get_level_values("store_id").to_numpy(),
+        "seller_ids": series.columns.get_level_values("seller_id").to_numpy(),
+        "product_ids": product_ids,
+        "series_prices": unit_prices.reindex(product_ids).to_numpy(dtype=float),
+        "quantities": np.clip(X_future @ coefficients, 0, None),
+        "variances": sigma2[np.newaxis, :] * (1 + leverage[:, np.newaxis]),
+    }
+    prediction_store["forecasts"] = compute_forecasts(prediction_store)
+
+    print("[" + str(datetime.datetime.now()) + f"] — Forecasts precomputed for {series.shape[1]} series and {MAX_HORIZON} horizons.")
+
+    return prediction_store
+
+
+# Agrège les prévisions des séries par magasin et par horizon
+### series_prices : prix unitaire de chaque série (None = prix courants)
+### series_stores : magasin de chaque série (None = affectation courante des vendeurs)
+### elasticity : élasticité prix de la demande (0 = les quantités ne dépendent pas du prix)
+def compute_forecasts(prediction_store, series_prices=None, series_stores=None, elasticity=0.0):
+    base_prices = prediction_store["series_prices"]
+    prices = base_prices if series_prices is None else series_prices
+    stores = prediction_store["store_ids"] if series_stores is None else series_stores
+
+    # Un prix nul (ou un prix de référence nul) ne modifie pas les quantités, pour éviter inf * 0 = NaN
+    ratio = np.divide(prices, base_prices, out=np.ones_like(prices), where=base_prices > 0)
+    volume_factor = np.power(ratio, elasticity, out=np.ones_like(ratio), where=ratio > 0)
+    quantities = prediction_store["quantities"] * volume_factor
+    amounts = quantities * prices
+    amount_variances = prediction_store["variances"] * (volume_factor * prices) ** 2
+
+    # Matrice d'appartenance série -> magasin pour agréger par simple produit matriciel
+    # INFO : tous les magasins sont présents, ceux sans vente ont des prévisions à 0
+    store_index = np.unique(np.concatenate([prediction_store["all_store_ids"], stores]))
+    membership = (stores[:, np.newaxis] == store_index[np.newaxis, :]).astype(float)
+
+    store_quantities = quantities @ membership
+    store_amounts = amounts @ membership
+    store_margins = INTERVAL_Z * np.sqrt(amount_variances @ membership)
+
+    horizons = np.arange(1, len(prediction_store["dates"]) + 1)
+
+    forecasts = pd.DataFrame({
+        "store_id": np.tile(store_index, len(horizons)),
+        "horizon": np.repeat(horizons, len(store_index)),
+        "date": np.repeat(prediction_store["dates"], len(store_index)),
+        "quantity": store_quantities.ravel(),
+        "amount": store_amounts.ravel(),
+        "amount_lower": np.clip(store_amounts - store_margins, 0, None).ravel(),
+        "amount_upper": (store_amounts + store_margins).ravel(),
+    })
+
+    return forecasts.set_index(["store_id", "horizon"]).sort_index()
+
+
+# Récupère les prévisions précalculées d'un magasin (tous les horizons ou un seul)
+# Retourne None si le magasin n'existait pas lors de l'entraînement
+def get_forecast(prediction_store, store_id, horizon=None):
+    forecasts = prediction_store["forecasts"]
+
+    if store_id not in forecasts.index.get_level_values("store_id"):
+        return None
+
+    if horizon is None:
+        return forecasts.loc[store_id]
+
+    return forecasts.loc[(store_id, horizon)]
+
+
+# Calcule un scénario "what-if" à partir des prévisions en cache, sans réentraînement
+### price_changes : {product_id: nouveau prix unitaire}
+### seller_moves : {seller_id: nouveau store_id}
+### amount_delta : écart de montant par rapport aux prévisions de référence
+def what_if(prediction_store, price_changes=None, seller_moves=None, elasticity=0.0):
+    series_prices = prediction_store["series_prices"]
+    if price_changes:
+        series_prices = pd.Series(prediction_store["product_ids"]).map(price_changes).fillna(
+            pd.Series(series_prices)
+        ).to_numpy(dtype=float)
+
+    series_stores = prediction_store["store_ids"]
+    if seller_moves:
+        series_stores = pd.Series(prediction_store["seller_ids"]).map(seller_moves).fillna(
+            pd.Series(series_stores)
+        ).to_numpy(dtype=series_stores.dtype)
+
+    scenario = compute_forecasts(prediction_store, series_prices, series_stores, elasticity)
+    baseline = prediction_store["forecasts"].reindex(scenario.index, fill_value=0)
+
+    scenario["amount_delta"] = scenario["amount"] - baseline["amount"]
+    scenario["quantity_delta"] = scenario["quantity"] - baseline["quantity"]
+
+    return scenario
+
+
+# Sauvegarde les prévisions précalculées sur disque
+# INFO : écriture dans un fichier temporaire puis remplacement atomique, un lecteur ne voit jamais un fichier incomplet
+def save_prediction_store(prediction_store, path=PREDICTION_STORE_PATH):
+    path = pathlib.Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            joblib.dump(prediction_store, f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+    print("[" + str(datetime.datetime.now()) + f"] — Prediction store saved to {path}.")
+
+
+# Charge les prévisions précalculées depuis le disque
+def load_prediction_store(path=PREDICTION_STORE_PATH):
+    path = pathlib.Path(path)
+    if not path.exists():
+        return None
+
+    return joblib.load(path)
+
+
+# Prévisions partagées par toutes les sessions, rechargées à chaque modification du fichier
+# INFO : mtime fait partie de la clé de cache, un réentraînement depuis la CLI est donc pris en compte
+# et seule la dernière version est gardée en mémoire
+@st.cache_resource(max_entries=1)
+def _load_cached_prediction_store(path, mtime):
+    try:
+        return load_prediction_store(path)
+    except Exception as e:
+        print("[" + str(datetime.datetime.now()) + f"] — Unable to load the prediction store: {e}")
+        return None
+
+
+# Charge la dernière version du fichier de prévisions (None si absent ou illisible)
+def _load_current_prediction_store(path):
+    try:
+        mtime = path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+    return _load_cached_prediction_store(path, mtime)
+
+
+# Indique si les prévisions correspondent aux données actuelles
+# INFO : si l'empreinte ne peut pas être calculée, on garde les prévisions existantes
+def _is_up_to_date(prediction_store, fingerprint):
+    return prediction_store is not None and (fingerprint is None or prediction_store.get("fingerprint") == fingerprint)
+
+
+# Récupère les prévisions à jour : entraînées si absentes ou si les données ont changé depuis l'entraînement
+def get_prediction_store(path=PREDICTION_STORE_PATH):
+    path = pathlib.Path(path)
+    prediction_store = _load_current_prediction_store(path)
+
+    if _is_up_to_date(prediction_store, u.getSalesDataFingerprint()):
+        return prediction_store
+
+    with _TRAINING_LOCK:
+        # Une autre session (ou la CLI) a peut-être déjà réentraîné pendant l'attente
+        u.getSalesDataFingerprint.clear()
+        prediction_store = _load_current_prediction_store(path)
+
+        if _is_up_to_date(prediction_store, u.getSalesDataFingerprint()):
+            return prediction_store
+
+        trained_store = train_prediction_store()
+        if trained_store is None:
+            return prediction_store
+
+        save_prediction_store(trained_store, path)
+
+        # On passe par le cache pour ne garder qu'une copie en mémoire
+        return _load_current_prediction_store(path) or trained_store
+
+
+# Entraîne le modèle et précalcule les prévisions (à lancer après chaque mise à jour des données)
+def main():
+    prediction_store = train_prediction_store()
+
+    if prediction_store is not None:
+        save_prediction_store(prediction_store)
+
+if __name__ == "__main__":
+    main()
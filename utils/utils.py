@@ -179,6 +179,98 @@ def getDashboardKPIs(store_id, current_month, current_year, last_month, last_mon
     )
 
 
+# Récupère la liste de tous les produits
+@st.cache_data(ttl=300)
+def getProducts():
+    rows = run_query("SELECT product_id, product_name, unit_price FROM products")
+    if not rows:
+        return None
+
+    return pd.DataFrame([{
+        "product_id": r[0],
+        "product_name": r[1],
+        "unit_price": float(r[2]),
+    } for r in rows])
+
+
+# Récupère la liste de tous les vendeurs
+@st.cache_data(ttl=300)
+def getSellers():
+    rows = run_query("SELECT seller_id, seller_name, store_id FROM sellers")
+    if not rows:
+        return None
+
+    return pd.DataFrame([{
+        "seller_id": r[0],
+        "seller_name": r[1],
+        "store_id": r[2],
+    } for r in rows])
+
+
+# Récupère les quantités vendues par mois, magasin, vendeur et produit
+### date : mois au format YYYY-MM
+### store_id, seller_id, product_id : identifiants de la série
+### quantity : quantité totale vendue
+@st.cache_data(ttl=300)
+def getMonthlyQuantities():
+    rows = run_query("""
+        SELECT
+            strftime('%Y-%m', o.order_date) AS date,
+            s.store_id,
+            o.seller_id,
+            oi.product_id,
+            SUM(oi.quantity) AS quantity
+        FROM order_items oi
+        JOIN orders o ON oi.order_id = o.order_id
+        JOIN sellers s ON o.seller_id = s.seller_id
+        GROUP BY date, s.store_id, o.seller_id, oi.product_id
+        ORDER BY date ASC
+    """)
+
+    if not rows:
+        return None
+
+    return pd.DataFrame([{
+        "date": r[0],
+        "store_id": r[1],
+        "seller_id": r[2],
+        "product_id": r[3],
+        "quantity": int(r[4])
+    } for r in rows])
+
+
+# Récupère une empreinte des données utilisées par les prévisions, pour détecter un changement de la base
+# INFO : cache court, la vérification n'est pas refaite à chaque interaction sur la page
+### last_order_date : date de la dernière commande
+### number_orders : nombre de commandes
+### number_order_items : nombre de lignes de commande
+### unit_prices : prix unitaires des produits (product_id:unit_price)
+### seller_stores : affectation des vendeurs aux magasins (seller_id:store_id)
+@st.cache_data(ttl=30)
+def getSalesDataFingerprint():
+    row = run_query("""
+        SELECT
+            (SELECT MAX(order_date) FROM orders) AS last_order_date,
+            (SELECT COUNT(*) FROM orders) AS number_orders,
+            (SELECT COUNT(*) FROM order_items) AS number_order_items,
+            (SELECT group_concat(product_id || ':' || unit_price, ',')
+               FROM (SELECT product_id, unit_price FROM products ORDER BY product_id)) AS unit_prices,
+            (SELECT group_concat(seller_id || ':' || IFNULL(store_id, ''), ',')
+               FROM (SELECT seller_id, store_id FROM sellers ORDER BY seller_id)) AS seller_stores
+    """, fetch="one")
+
+    if not row:
+        return None
+
+    return {
+        "last_order_date": row[0],
+        "number_orders": int(row[1]),
+        "number_order_items": int(row[2]),
+        "unit_prices": row[3],
+        "seller_stores": row[4]
+    }
+
+
 # Création du line chart pour les ventes et montants sur les mois
 # INFO : utilisation de plotly pour un graphique avec double y-axes
 def createLineChart(sales_data):